@@ -1,13 +1,17 @@
-from flask import Flask
+import click
+from flask import Flask, render_template, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from flask_caching import Cache
+from werkzeug.security import generate_password_hash
 from app.config import Config
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+cache = Cache()
 
 def create_app(config_class=Config):
     """Application factory pattern"""
@@ -18,6 +22,13 @@ def create_app(config_class=Config):
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
+    cache.init_app(app)
+    
+    # Hash checked for unknown usernames so they cost the same as accounts
+    # hashed with PASSWORD_HASH_METHOD (older hashes are upgraded on login)
+    app.config['DUMMY_PW_HASH'] = generate_password_hash(
+        'dummy-password', method=app.config['PASSWORD_HASH_METHOD']
+    )
     
     # Login manager configuration
     login_manager.login_view = 'auth.login'
@@ -40,22 +51,34 @@ def create_app(config_class=Config):
     app.register_blueprint(performance.bp)
     app.register_blueprint(auth.bp)
     
+    # CLI: populate cached dashboard counters in Redis (run on deploy)
+    @app.cli.command('prewarm-dashboard')
+    def prewarm_dashboard():
+        """Compute and cache the dashboard statistics"""
+        if app.config['CACHE_TYPE'] != 'RedisCache':
+            # A per-process cache would only warm this CLI process
+            click.echo('Dashboard cache not warmed: set REDIS_URL so the cache '
+                       'is shared with the web workers.', err=True)
+            raise SystemExit(1)
+        
+        from app.services.dashboard_stats import get_dashboard_stats, invalidate_dashboard_stats
+        invalidate_dashboard_stats()
+        total, shortage, poor = get_dashboard_stats()
+        click.echo(f'Dashboard cache warmed: {total} students, {shortage} shortage, {poor} poor performance')
+    
     # Register error handlers
     @app.errorhandler(404)
     def not_found_error(error):
-        from flask import render_template
         return render_template('404.html'), 404
     
     @app.errorhandler(500)
     def internal_error(error):
-        from flask import render_template
         db.session.rollback()
         return render_template('500.html'), 500
     
     # Home route
     @app.route('/')
     def index():
-        from flask import redirect, url_for
         return redirect(url_for('students.dashboard'))
     
     return app
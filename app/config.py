@@ -24,14 +24,37 @@ class Config:
         f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Size the pool to (worker threads per process); pre_ping replaces
+    # connections MySQL has dropped after wait_timeout
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '20')),
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'pool_timeout': 30,
+    }
     SQLALCHEMY_ECHO = DEBUG
     
+    # Cache settings (Redis when REDIS_URL is set, in-process otherwise)
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_TYPE = 'RedisCache' if CACHE_REDIS_URL else 'SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = 300
+    DASHBOARD_CACHE_TIMEOUT = 60
+    
     # WTForms settings
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None  # No time limit for CSRF tokens
     
+    # Password hashing (werkzeug method string, e.g. 'scrypt:32768:8:1';
+    # aim for ~100ms per hash on the deployment hardware)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    
     # Pagination
     STUDENTS_PER_PAGE = 10
+    EXPORT_BATCH_SIZE = 1000  # Students per query when streaming the CSV export
+    
+    # Search (must match MySQL's innodb_ft_min_token_size)
+    FULLTEXT_MIN_WORD_LEN = 3
     
     # Performance thresholds
     ATTENDANCE_WARNING_THRESHOLD = 75.0
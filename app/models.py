@@ -1,11 +1,21 @@
+import re
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.dialects.mysql import match
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from app.config import Config
+
+# Characters with special meaning in MySQL boolean-mode full-text queries
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
 
 class User(UserMixin, db.Model):
     """Admin user model for authentication"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_user_login_cover', 'username', 'password_hash'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
@@ -15,50 +25,75 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Hash and set the password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=Config.PASSWORD_HASH_METHOD)
     
     def check_password(self, password):
         """Verify password against hash"""
         return check_password_hash(self.password_hash, password)
     
+    def needs_rehash(self):
+        """Check if the stored hash uses a method other than the configured one"""
+        return self.password_hash.split('$', 1)[0] != Config.PASSWORD_HASH_METHOD
+    
     def __repr__(self):
         return f'<User {self.username}>'
 
 class Student(db.Model):
     """Student model"""
     __tablename__ = 'students'
+    __table_args__ = (
+        db.Index('ft_student_search', 'name', 'roll_no', mysql_prefix='FULLTEXT'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     roll_no = db.Column(db.String(20), unique=True, nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False, index=True)
     semester = db.Column(db.Integer, nullable=False)
+    # Denormalized performance summary, maintained by the Performance events below
+    cached_avg_marks = db.Column(db.Double, nullable=True, index=True)
+    cached_perf_count = db.Column(db.Integer, nullable=True, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    attendance_records = db.relationship('Attendance', backref='student', lazy='dynamic', cascade='all, delete-orphan')
-    performance_records = db.relationship('Performance', backref='student', lazy='dynamic', cascade='all, delete-orphan')
+    attendance_records = db.relationship('Attendance', back_populates='student', cascade='all, delete-orphan')
+    performance_records = db.relationship('Performance', back_populates='student', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Student {self.roll_no}: {self.name}>'
     
+    @classmethod
+    def search_filter(cls, search):
+        """
+        Build a WHERE clause matching students by roll number or name
+        
+        Uses the FULLTEXT index on MySQL (word-prefix match on every term);
+        falls back to an index-friendly prefix LIKE for terms shorter than
+        the full-text minimum token size or on other databases.
+        """
+        terms = _FULLTEXT_OPERATORS.sub(' ', search).split()
+        if (db.engine.dialect.name == 'mysql' and terms and
+                min(len(t) for t in terms) >= Config.FULLTEXT_MIN_WORD_LEN):
+            against = ' '.join(f'+{t}*' for t in terms)
+            return match(cls.name, cls.roll_no, against=against).in_boolean_mode()
+        
+        prefix = f'{search}%'
+        return db.or_(cls.roll_no.like(prefix), cls.name.like(prefix))
+    
     @property
     def attendance(self):
         """Get the student's attendance record"""
-        return self.attendance_records.first()
+        return self.attendance_records[0] if self.attendance_records else None
     
     @property
     def performance(self):
         """Get the student's latest performance record"""
-        return self.performance_records.order_by(Performance.created_at.desc()).first()
+        return max(self.performance_records, key=lambda r: r.created_at, default=None)
     
     @property
     def average_marks(self):
-        """Calculate average marks across all subjects"""
-        records = self.performance_records.all()
-        if not records:
-            return 0.0
-        return sum(r.marks for r in records) / len(records)
+        """Average marks across all subjects (0.0 when no marks yet)"""
+        return self.cached_avg_marks or 0.0
 
 class Attendance(db.Model):
     """Attendance model"""
@@ -68,42 +103,113 @@ class Attendance(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
     total_lectures = db.Column(db.Integer, default=0, nullable=False)
     attended_lectures = db.Column(db.Integer, default=0, nullable=False)
+    # Stored generated column (read-only); indexed for threshold queries
+    attendance_percentage = db.Column(
+        db.Numeric(5, 2, asdecimal=False),
+        db.Computed('CASE WHEN total_lectures > 0 '
+                    'THEN attended_lectures * 100.0 / total_lectures ELSE 0 END', persisted=True),
+        index=True
+    )
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    student = db.relationship('Student', back_populates='attendance_records')
+    
     def __repr__(self):
-        return f'<Attendance Student:{self.student_id} {self.attendance_percentage:.2f}%>'
+        return f'<Attendance Student:{self.student_id} {self.current_percentage:.2f}%>'
     
     @property
-    def attendance_percentage(self):
-        """Calculate attendance percentage"""
-        if self.total_lectures == 0:
+    def current_percentage(self):
+        """Stored percentage, or computed from the counts before the row is flushed"""
+        if self.attendance_percentage is not None:
+            return self.attendance_percentage
+        if not self.total_lectures:
             return 0.0
-        return (self.attended_lectures * 100.0) / self.total_lectures
+        return ((self.attended_lectures or 0) * 100.0) / self.total_lectures
     
     @property
     def has_shortage(self):
         """Check if attendance is below threshold"""
-        from app.config import Config
-        return self.attendance_percentage < Config.ATTENDANCE_WARNING_THRESHOLD
+        return self.current_percentage < Config.ATTENDANCE_WARNING_THRESHOLD
 
 class Performance(db.Model):
     """Performance/Marks model"""
     __tablename__ = 'performance'
+    __table_args__ = (
+        db.Index('ix_perf_student_subject', 'student_id', 'subject_name'),
+        db.Index('ix_perf_student_created', 'student_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
     subject_name = db.Column(db.String(100), default='General', nullable=False)
-    marks = db.Column(db.Numeric(5, 2), nullable=False)
+    marks = db.Column(db.Float, nullable=False)
     remark = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    student = db.relationship('Student', back_populates='performance_records')
+    
     def __repr__(self):
         return f'<Performance Student:{self.student_id} {self.subject_name}: {self.marks}>'
-    
-    def __init__(self, **kwargs):
-        super(Performance, self).__init__(**kwargs)
-        # Auto-generate remark if not provided
-        if not self.remark and self.marks is not None:
-            from app.services.ai_engine import AIEngine
-            self.remark = AIEngine.generate_performance_remark(float(self.marks))
+
+def _apply_marks_delta(connection, student_id, marks_delta, count_delta):
+    """Fold a change in one student's marks into the cached summary columns"""
+    students = Student.__table__
+    count = func.coalesce(students.c.cached_perf_count, 0)
+    avg = func.coalesce(students.c.cached_avg_marks, 0)
+    new_count = count + count_delta
+    
+    # avg is assigned before count because MySQL evaluates SET left to right;
+    # updated_at is pinned so summary refreshes don't look like student edits
+    connection.execute(
+        update(students)
+        .where(students.c.id == student_id)
+        .ordered_values(
+            (students.c.cached_avg_marks,
+             case((new_count > 0, (avg * count + marks_delta) / new_count), else_=None)),
+            (students.c.cached_perf_count, new_count),
+            (students.c.updated_at, students.c.updated_at),
+        )
+    )
+
+def _recompute_marks_summary(connection, student_id):
+    """Rebuild one student's cached summary columns from the performance table"""
+    students = Student.__table__
+    perf = Performance.__table__
+    connection.execute(
+        update(students)
+        .where(students.c.id == student_id)
+        .values(
+            cached_avg_marks=select(func.avg(perf.c.marks))
+                .where(perf.c.student_id == student_id).scalar_subquery(),
+            cached_perf_count=select(func.count(perf.c.id))
+                .where(perf.c.student_id == student_id).scalar_subquery(),
+            updated_at=students.c.updated_at,
+        )
+    )
+
+@event.listens_for(Performance, 'after_insert')
+def _performance_inserted(mapper, connection, target):
+    _apply_marks_delta(connection, target.student_id, target.marks, 1)
+
+@event.listens_for(Performance, 'after_delete')
+def _performance_deleted(mapper, connection, target):
+    if 'marks' in inspect(target).unloaded:
+        # The row is already gone, so its marks can't be loaded now
+        _recompute_marks_summary(connection, target.student_id)
+    else:
+        _apply_marks_delta(connection, target.student_id, -target.marks, -1)
+
+@event.listens_for(Performance, 'after_update')
+def _performance_updated(mapper, connection, target):
+    # Edits are rare and the previous marks may not be loaded, so
+    # recompute instead of applying a delta
+    state = inspect(target)
+    if not (state.attrs.marks.history.has_changes() or
+            state.attrs.student_id.history.has_changes()):
+        return
+    _recompute_marks_summary(connection, target.student_id)
+    for old_student_id in state.attrs.student_id.history.deleted:
+        _recompute_marks_summary(connection, old_student_id)
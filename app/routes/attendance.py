@@ -1,11 +1,14 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from datetime import datetime
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
 from flask_login import login_required
 from flask_wtf import FlaskForm
+from sqlalchemy.orm import joinedload, raiseload
 from wtforms import SelectField, IntegerField, SubmitField
 from wtforms.validators import DataRequired, NumberRange, ValidationError
 from app import db
 from app.models import Student, Attendance
 from app.services.ai_engine import AIEngine
+from app.services.choice_cache import get_student_choices
 
 bp = Blueprint('attendance', __name__, url_prefix='/attendance')
 
@@ -33,21 +36,17 @@ def view_attendance():
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     
-    # Base query
-    query = Student.query
+    # Base query - each student paired with its attendance row (if any)
+    query = db.session.query(Student, Attendance).outerjoin(
+        Attendance, Attendance.student_id == Student.id
+    ).options(raiseload('*'))
     
     # Search functionality
     if search:
-        search_filter = f'%{search}%'
-        query = query.filter(
-            db.or_(
-                Student.roll_no.like(search_filter),
-                Student.name.like(search_filter)
-            )
-        )
+        query = query.filter(Student.search_filter(search))
     
     # Pagination
-    students = query.order_by(Student.roll_no).paginate(
+    rows = query.order_by(Student.roll_no).paginate(
         page=page,
         per_page=10,
         error_out=False
@@ -55,25 +54,20 @@ def view_attendance():
     
     # Prepare data with warnings
     attendance_data = []
-    for student in students.items:
-        att = student.attendance
+    for student, att in rows.items:
         if att:
             warning = AIEngine.generate_attendance_warning(att.attendance_percentage)
-            attendance_data.append({
-                'student': student,
-                'attendance': att,
-                'warning': warning
-            })
         else:
-            attendance_data.append({
-                'student': student,
-                'attendance': None,
-                'warning': {'has_warning': False}
-            })
+            warning = {'has_warning': False}
+        attendance_data.append({
+            'student': student,
+            'attendance': att,
+            'warning': warning
+        })
     
     return render_template('attendance_view.html',
                          attendance_data=attendance_data,
-                         pagination=students,
+                         pagination=rows,
                          search=search)
 
 @bp.route('/add', methods=['GET', 'POST'])
@@ -83,18 +77,21 @@ def add_attendance():
     form = AttendanceForm()
     
     # Populate student choices
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if form.validate_on_submit():
         student_id = form.student_id.data
-        student = Student.query.get_or_404(student_id)
         
-        # Check if attendance record already exists
-        existing_attendance = Attendance.query.filter_by(student_id=student_id).first()
+        # Fetch the student and any existing attendance record in one query
+        row = db.session.query(Student.name, Attendance).outerjoin(
+            Attendance, Attendance.student_id == Student.id
+        ).filter(Student.id == student_id).first()
+        if row is None:
+            abort(404)
+        student_name, existing_attendance = row
         
         if existing_attendance:
-            flash(f'Attendance record already exists for {student.name}. Use Edit to update.', 'warning')
+            flash(f'Attendance record already exists for {student_name}. Use Edit to update.', 'warning')
             return redirect(url_for('attendance.edit_attendance', id=existing_attendance.id))
         
         # Create new attendance record
@@ -111,7 +108,7 @@ def add_attendance():
             # Generate AI warning if needed
             warning = AIEngine.generate_attendance_warning(attendance.attendance_percentage)
             
-            flash(f'Attendance created for {student.name}: {attendance.attendance_percentage:.2f}%', 'success')
+            flash(f'Attendance created for {student_name}: {attendance.attendance_percentage:.2f}%', 'success')
             
             if warning['has_warning']:
                 flash(warning['message'], 'warning')
@@ -131,16 +128,20 @@ def mark_attendance():
     form = AttendanceForm()
     
     # Populate student choices
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if form.validate_on_submit():
         student_id = form.student_id.data
-        student = Student.query.get_or_404(student_id)
         
-        # Get or create attendance record
-        attendance = Attendance.query.filter_by(student_id=student_id).first()
+        # Fetch the student and any existing attendance record in one query
+        row = db.session.query(Student.name, Attendance).outerjoin(
+            Attendance, Attendance.student_id == Student.id
+        ).filter(Student.id == student_id).first()
+        if row is None:
+            abort(404)
+        student_name, attendance = row
         
+        # Get or create attendance record
         if attendance is None:
             attendance = Attendance(student_id=student_id)
             db.session.add(attendance)
@@ -157,7 +158,7 @@ def mark_attendance():
             # Generate AI warning if needed
             warning = AIEngine.generate_attendance_warning(attendance.attendance_percentage)
             
-            flash(f'Attendance {action} for {student.name}: {attendance.attendance_percentage:.2f}%', 'success')
+            flash(f'Attendance {action} for {student_name}: {attendance.attendance_percentage:.2f}%', 'success')
             
             if warning['has_warning']:
                 flash(warning['message'], 'warning')
@@ -173,7 +174,7 @@ def mark_attendance():
 @bp.route('/detail/<int:id>')
 def view_attendance_detail(id):
     """View single attendance record detail (READ)"""
-    attendance = Attendance.query.get_or_404(id)
+    attendance = Attendance.query.options(joinedload(Attendance.student)).filter_by(id=id).first_or_404()
     student = attendance.student
     
     # Get AI warning
@@ -195,14 +196,13 @@ def view_attendance_detail(id):
 @login_required
 def edit_attendance(id):
     """Edit attendance record (UPDATE)"""
-    attendance = Attendance.query.get_or_404(id)
+    attendance = Attendance.query.options(joinedload(Attendance.student)).filter_by(id=id).first_or_404()
     student = attendance.student
     
     form = AttendanceForm(obj=attendance)
     
     # Populate student choices and set current student as default
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if request.method == 'GET':
         form.student_id.data = student.id
@@ -237,11 +237,12 @@ def edit_attendance(id):
 @login_required
 def delete_attendance(id):
     """Delete attendance record (DELETE)"""
-    attendance = Attendance.query.get_or_404(id)
-    student_name = attendance.student.name
+    student_name = db.session.query(Student.name).join(Attendance).filter(Attendance.id == id).scalar()
+    if student_name is None:
+        abort(404)
     
     try:
-        db.session.delete(attendance)
+        db.session.query(Attendance).filter_by(id=id).delete(synchronize_session=False)
         db.session.commit()
         flash(f'Attendance record for {student_name} deleted successfully!', 'success')
     except Exception as e:
@@ -254,12 +255,16 @@ def delete_attendance(id):
 @login_required
 def reset_attendance(id):
     """Reset attendance record to zero (UPDATE)"""
-    attendance = Attendance.query.get_or_404(id)
-    student_name = attendance.student.name
+    student_name = db.session.query(Student.name).join(Attendance).filter(Attendance.id == id).scalar()
+    if student_name is None:
+        abort(404)
     
     try:
-        attendance.total_lectures = 0
-        attendance.attended_lectures = 0
+        db.session.query(Attendance).filter_by(id=id).update({
+            'total_lectures': 0,
+            'attended_lectures': 0,
+            'last_updated': datetime.utcnow()
+        }, synchronize_session=False)
         db.session.commit()
         flash(f'Attendance reset to 0/0 for {student_name}', 'success')
     except Exception as e:
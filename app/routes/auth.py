@@ -1,8 +1,10 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
+from sqlalchemy.orm import load_only, raiseload
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Length
+from werkzeug.security import check_password_hash
 from app import db
 from app.models import User
 
@@ -22,12 +24,29 @@ def login():
     form = LoginForm()
     
     if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
+        # Only the columns needed to authenticate; covered by ix_user_login_cover
+        user = User.query.options(
+            load_only(User.id, User.username, User.password_hash),
+            raiseload('*')
+        ).filter_by(username=form.username.data).first()
         
-        if user is None or not user.check_password(form.password.data):
+        if user is None:
+            # Still pay for one hash check so unknown usernames aren't faster
+            check_password_hash(current_app.config['DUMMY_PW_HASH'], form.password.data)
+            valid = False
+        else:
+            valid = user.check_password(form.password.data)
+        
+        if not valid:
             flash('Invalid username or password', 'danger')
             return redirect(url_for('auth.login'))
         
+        # Upgrade hashes made with an older method (e.g. the scrypt seed) so
+        # every account costs the same as the dummy check
+        if user.needs_rehash():
+            user.set_password(form.password.data)
+            db.session.commit()
+        
         login_user(user, remember=form.remember_me.data)
         flash(f'Welcome back, {user.username}!', 'success')
         
@@ -1,19 +1,26 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
 from flask_login import login_required
 from flask_wtf import FlaskForm
-from wtforms import SelectField, DecimalField, StringField, SubmitField
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload
+from wtforms import SelectField, FloatField, StringField, SubmitField
 from wtforms.validators import DataRequired, NumberRange
 from app import db
 from app.models import Student, Performance
 from app.services.ai_engine import AIEngine
+from app.services.choice_cache import get_student_choices
 
 bp = Blueprint('performance', __name__, url_prefix='/performance')
 
+def _round_marks(value):
+    """Round to the 2 places performance.marks stores (DECIMAL(5,2))"""
+    return round(value, 2) if value is not None else value
+
 class PerformanceForm(FlaskForm):
     """Form for entering/editing performance/marks"""
     student_id = SelectField('Select Student', coerce=int, validators=[DataRequired()])
     subject_name = StringField('Subject Name', validators=[DataRequired()], default='General')
-    marks = DecimalField('Marks (out of 100)', validators=[
+    marks = FloatField('Marks (out of 100)', filters=[_round_marks], validators=[
         DataRequired(message='Marks are required'),
         NumberRange(min=0, max=100, message='Marks must be between 0 and 100')
     ])
@@ -25,18 +32,12 @@ def view_performance():
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     
-    # Base query
-    query = Student.query
+    # Base query - load the page's performance rows in one SELECT ... IN
+    query = Student.query.options(selectinload(Student.performance_records))
     
     # Search functionality
     if search:
-        search_filter = f'%{search}%'
-        query = query.filter(
-            db.or_(
-                Student.roll_no.like(search_filter),
-                Student.name.like(search_filter)
-            )
-        )
+        query = query.filter(Student.search_filter(search))
     
     # Pagination
     students = query.order_by(Student.roll_no).paginate(
@@ -45,17 +46,17 @@ def view_performance():
         error_out=False
     )
     
-    # Prepare performance data
+    # Prepare performance data from the cached per-student summary
     performance_data = []
     for student in students.items:
-        perf_records = student.performance_records.all()
         avg_marks = student.average_marks
+        count = student.cached_perf_count or 0
         
         performance_data.append({
             'student': student,
-            'records': perf_records,
+            'records': student.performance_records,
             'average': avg_marks,
-            'remark': AIEngine.generate_performance_remark(avg_marks) if perf_records else 'N/A'
+            'remark': AIEngine.generate_performance_remark(avg_marks) if count else 'N/A'
         })
     
     return render_template('performance_view.html',
@@ -70,15 +71,14 @@ def add_performance():
     form = PerformanceForm()
     
     # Populate student choices
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if form.validate_on_submit():
         student_id = form.student_id.data
         student = Student.query.get_or_404(student_id)
         
         # Generate AI remark
-        remark = AIEngine.generate_performance_remark(float(form.marks.data))
+        remark = AIEngine.generate_performance_remark(form.marks.data)
         
         # Create new performance record
         performance = Performance(
@@ -96,9 +96,9 @@ def add_performance():
                   f'{form.marks.data}/100 - {remark}', 'success')
             
             # Provide AI suggestions based on performance
-            if float(form.marks.data) < 50:
+            if form.marks.data < 50:
                 flash('AI Suggestion: Student may benefit from additional tutoring or study support', 'info')
-            elif float(form.marks.data) >= 90:
+            elif form.marks.data >= 90:
                 flash('AI Suggestion: Excellent performance! Consider advanced learning opportunities', 'info')
             
             return redirect(url_for('performance.view_performance'))
@@ -115,21 +115,24 @@ def enter_performance():
     form = PerformanceForm()
     
     # Populate student choices
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if form.validate_on_submit():
         student_id = form.student_id.data
-        student = Student.query.get_or_404(student_id)
         
-        # Generate AI remark
-        remark = AIEngine.generate_performance_remark(float(form.marks.data))
+        # Fetch the student and any record for this subject in one query
+        row = db.session.query(Student.name, Performance).outerjoin(
+            Performance, db.and_(
+                Performance.student_id == Student.id,
+                Performance.subject_name == form.subject_name.data
+            )
+        ).filter(Student.id == student_id).first()
+        if row is None:
+            abort(404)
+        student_name, performance = row
         
-        # Check if performance record exists for this subject
-        performance = Performance.query.filter_by(
-            student_id=student_id,
-            subject_name=form.subject_name.data
-        ).first()
+        # Generate AI remark
+        remark = AIEngine.generate_performance_remark(form.marks.data)
         
         if performance is None:
             performance = Performance(
@@ -146,13 +149,13 @@ def enter_performance():
         
         try:
             db.session.commit()
-            flash(f'Marks {action} for {student.name} in {form.subject_name.data}: '
+            flash(f'Marks {action} for {student_name} in {form.subject_name.data}: '
                   f'{form.marks.data}/100 - {remark}', 'success')
             
             # Provide AI suggestions based on performance
-            if float(form.marks.data) < 50:
+            if form.marks.data < 50:
                 flash('AI Suggestion: Student may benefit from additional tutoring or study support', 'info')
-            elif float(form.marks.data) >= 90:
+            elif form.marks.data >= 90:
                 flash('AI Suggestion: Excellent performance! Consider advanced learning opportunities', 'info')
             
             return redirect(url_for('performance.view_performance'))
@@ -165,7 +168,7 @@ def enter_performance():
 @bp.route('/detail/<int:id>')
 def view_performance_detail(id):
     """View single performance record detail (READ)"""
-    performance = Performance.query.get_or_404(id)
+    performance = Performance.query.options(joinedload(Performance.student)).filter_by(id=id).first_or_404()
     student = performance.student
     
     return render_template('performance_detail.html',
@@ -176,7 +179,7 @@ def view_performance_detail(id):
 def view_student_performance(student_id):
     """View all performance records for a specific student (READ)"""
     student = Student.query.get_or_404(student_id)
-    performances = student.performance_records.order_by(Performance.subject_name).all()
+    performances = sorted(student.performance_records, key=lambda r: r.subject_name)
     
     avg_marks = student.average_marks
     overall_remark = AIEngine.generate_performance_remark(avg_marks) if performances else 'N/A'
@@ -191,23 +194,22 @@ def view_student_performance(student_id):
 @login_required
 def edit_performance(id):
     """Edit performance record (UPDATE)"""
-    performance = Performance.query.get_or_404(id)
+    performance = Performance.query.options(joinedload(Performance.student)).filter_by(id=id).first_or_404()
     student = performance.student
     
     form = PerformanceForm(obj=performance)
     
     # Populate student choices
-    students = Student.query.order_by(Student.roll_no).all()
-    form.student_id.choices = [(s.id, f'{s.roll_no} - {s.name}') for s in students]
+    form.student_id.choices = get_student_choices()
     
     if request.method == 'GET':
         form.student_id.data = student.id
         form.subject_name.data = performance.subject_name
-        form.marks.data = float(performance.marks)
+        form.marks.data = performance.marks
     
     if form.validate_on_submit():
         # Generate AI remark
-        remark = AIEngine.generate_performance_remark(float(form.marks.data))
+        remark = AIEngine.generate_performance_remark(form.marks.data)
         
         performance.subject_name = form.subject_name.data
         performance.marks = form.marks.data
@@ -220,9 +222,9 @@ def edit_performance(id):
                   f'{form.marks.data}/100 - {remark}', 'success')
             
             # Provide AI suggestions
-            if float(form.marks.data) < 50:
+            if form.marks.data < 50:
                 flash('AI Suggestion: Student may benefit from additional support', 'info')
-            elif float(form.marks.data) >= 90:
+            elif form.marks.data >= 90:
                 flash('AI Suggestion: Excellent! Encourage advanced topics', 'info')
             
             return redirect(url_for('performance.view_performance'))
@@ -239,7 +241,7 @@ def edit_performance(id):
 @login_required
 def delete_performance(id):
     """Delete performance record (DELETE)"""
-    performance = Performance.query.get_or_404(id)
+    performance = Performance.query.options(joinedload(Performance.student)).filter_by(id=id).first_or_404()
     student_name = performance.student.name
     subject_name = performance.subject_name
     
@@ -260,10 +262,18 @@ def delete_all_student_performance(student_id):
     student = Student.query.get_or_404(student_id)
     
     try:
-        count = student.performance_records.count()
-        student.performance_records.delete()
+        # One bulk DELETE; the per-row summary events don't fire for it,
+        # so reset the cached summary in the same transaction instead
+        count = Performance.query.filter_by(student_id=student.id).delete(synchronize_session=False)
+        db.session.execute(
+            update(Student)
+            .where(Student.id == student.id)
+            .values(cached_avg_marks=None, cached_perf_count=0, updated_at=Student.updated_at),
+            execution_options={'synchronize_session': False}
+        )
+        student_name = student.name
         db.session.commit()
-        flash(f'Deleted {count} performance record(s) for {student.name}', 'success')
+        flash(f'Deleted {count} performance record(s) for {student_name}', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error deleting performance records: {str(e)}', 'danger')
@@ -1,11 +1,16 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import csv
+from io import StringIO
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, Response, stream_with_context
 from flask_login import login_required
 from flask_wtf import FlaskForm
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import joinedload, selectinload
 from wtforms import StringField, IntegerField, SubmitField
 from wtforms.validators import DataRequired, Length, NumberRange, ValidationError
 from app import db
 from app.models import Student, Attendance, Performance
 from app.services.ai_engine import AIEngine
+from app.services.dashboard_stats import get_dashboard_stats
 from app.config import Config
 
 bp = Blueprint('students', __name__)
@@ -33,27 +38,23 @@ class StudentForm(FlaskForm):
     def validate_roll_no(self, field):
         """Custom validator for roll number uniqueness"""
         if field.data != self.original_roll_no:
-            student = Student.query.filter_by(roll_no=field.data).first()
-            if student:
+            # Index-only lookup on the unique roll_no key; no row hydration
+            exists = db.session.query(Student.id).filter_by(roll_no=field.data).scalar() is not None
+            if exists:
                 raise ValidationError('Roll number already exists')
 
+def _get_student_with_records(id):
+    """Load a student with its attendance and performance records, or 404"""
+    # At most one attendance row, so joining it costs nothing extra
+    return Student.query.options(
+        joinedload(Student.attendance_records),
+        selectinload(Student.performance_records)
+    ).get_or_404(id)
+
 @bp.route('/dashboard')
 def dashboard():
     """Dashboard with statistics"""
-    total_students = Student.query.count()
-    
-    # Students with attendance shortage
-    students_with_shortage = 0
-    all_students = Student.query.all()
-    for student in all_students:
-        if student.attendance and student.attendance.has_shortage:
-            students_with_shortage += 1
-    
-    # Students with poor performance
-    students_poor_performance = 0
-    for student in all_students:
-        if student.average_marks < Config.PERFORMANCE_AVERAGE_THRESHOLD:
-            students_poor_performance += 1
+    total_students, students_with_shortage, students_poor_performance = get_dashboard_stats()
     
     return render_template('dashboard.html',
                          total_students=total_students,
@@ -66,17 +67,12 @@ def list_students():
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     
-    query = Student.query
+    # average_marks reads the cached column, so only attendance needs loading
+    query = Student.query.options(selectinload(Student.attendance_records))
     
     # Search functionality
     if search:
-        search_filter = f'%{search}%'
-        query = query.filter(
-            db.or_(
-                Student.roll_no.like(search_filter),
-                Student.name.like(search_filter)
-            )
-        )
+        query = query.filter(Student.search_filter(search))
     
     # Pagination
     pagination = query.order_by(Student.roll_no).paginate(
@@ -116,16 +112,13 @@ def add_student():
                 name=form.name.data.strip(),
                 semester=form.semester.data
             )
+            # Initialize attendance record; the cascade inserts it in the same flush
+            student.attendance_records.append(Attendance())
             
             try:
                 db.session.add(student)
                 db.session.commit()
                 
-                # Initialize attendance record
-                attendance = Attendance(student_id=student.id)
-                db.session.add(attendance)
-                db.session.commit()
-                
                 flash(f'Student {student.name} added successfully!', 'success')
                 return redirect(url_for('students.list_students'))
             except Exception as e:
@@ -140,7 +133,7 @@ def add_student():
 @bp.route('/students/view/<int:id>')
 def view_student(id):
     """View single student details (READ)"""
-    student = Student.query.get_or_404(id)
+    student = _get_student_with_records(id)
     
     # Get AI-generated insights
     insights = AIEngine.generate_student_insights(student)
@@ -161,10 +154,20 @@ def view_student(id):
 @login_required
 def edit_student(id):
     """Edit existing student (UPDATE)"""
-    student = Student.query.get_or_404(id)
+    # Only the form page renders the records; a save just needs the row
+    if request.method == 'GET':
+        student = _get_student_with_records(id)
+    else:
+        student = Student.query.get_or_404(id)
     form = StudentForm(original_roll_no=student.roll_no, obj=student)
     
     if form.validate_on_submit():
+        # Nothing changed - skip validation and the write entirely
+        submitted = (form.roll_no.data.strip(), form.name.data.strip(), form.semester.data)
+        if submitted == (student.roll_no, student.name, student.semester):
+            flash(f'No changes made to {student.name}', 'info')
+            return redirect(url_for('students.list_students'))
+        
         # AI-assisted validation
         validation = AIEngine.validate_student_data(
             form.roll_no.data,
@@ -197,17 +200,23 @@ def edit_student(id):
 @login_required
 def delete_student(id):
     """Delete student (DELETE) - Cascades to attendance and performance"""
-    student = Student.query.get_or_404(id)
+    # Name, roll number and related-record counts in one query
+    attendance_count = select(func.count(Attendance.id)).where(
+        Attendance.student_id == Student.id
+    ).scalar_subquery()
+    performance_count = select(func.count(Performance.id)).where(
+        Performance.student_id == Student.id
+    ).scalar_subquery()
+    row = db.session.query(
+        Student.name, Student.roll_no, attendance_count, performance_count
+    ).filter(Student.id == id).first()
+    if row is None:
+        abort(404)
+    name, roll_no, attendance_count, performance_count = row
     
     try:
-        name = student.name
-        roll_no = student.roll_no
-        
-        # Get counts for confirmation message
-        attendance_count = student.attendance_records.count()
-        performance_count = student.performance_records.count()
-        
-        db.session.delete(student)
+        # Related rows go via the ON DELETE CASCADE foreign keys
+        db.session.execute(delete(Student).where(Student.id == id))
         db.session.commit()
         
         flash(f'Student {name} ({roll_no}) deleted successfully! '
@@ -222,7 +231,7 @@ def delete_student(id):
 @bp.route('/students/report/<int:id>')
 def student_report(id):
     """Detailed student report"""
-    student = Student.query.get_or_404(id)
+    student = _get_student_with_records(id)
     
     # Get AI-generated insights
     insights = AIEngine.generate_student_insights(student)
@@ -250,43 +259,60 @@ def student_report(id):
 
 @bp.route('/students/export')
 def export_students():
-    """Export students data to CSV"""
-    import csv
-    from io import StringIO
-    from flask import make_response
-    
-    students = Student.query.order_by(Student.roll_no).all()
-    
-    # Create CSV in memory
-    si = StringIO()
-    writer = csv.writer(si)
-    
-    # Write header
-    writer.writerow([
-        'Roll No', 'Name', 'Semester',
-        'Total Lectures', 'Attended Lectures', 'Attendance %',
-        'Average Marks', 'Performance Remark'
-    ])
-    
-    # Write data
-    for student in students:
-        att = student.attendance
-        perf = student.performance
+    """Export students data to CSV (streamed in batches)"""
+    def generate():
+        # Small reusable buffer so csv.writer handles quoting
+        si = StringIO()
+        writer = csv.writer(si)
+        
+        def drain():
+            data = si.getvalue()
+            si.seek(0)
+            si.truncate(0)
+            return data
         
+        # Write header
         writer.writerow([
-            student.roll_no,
-            student.name,
-            student.semester,
-            att.total_lectures if att else 0,
-            att.attended_lectures if att else 0,
-            f'{att.attendance_percentage:.2f}' if att else '0.00',
-            f'{student.average_marks:.2f}',
-            perf.remark if perf else 'N/A'
+            'Roll No', 'Name', 'Semester',
+            'Total Lectures', 'Attended Lectures', 'Attendance %',
+            'Average Marks', 'Performance Remark'
         ])
+        yield drain()
+        
+        # Latest remark per student (ix_perf_student_created)
+        latest_remark = select(Performance.remark).where(
+            Performance.student_id == Student.id
+        ).order_by(Performance.created_at.desc(), Performance.id.desc()).limit(1).scalar_subquery()
+        
+        # Rows come back from SQL ready to write; CAST to DECIMAL(5,2)
+        # gives the two-decimal formatting without per-row Python work
+        base_query = select(
+            Student.roll_no,
+            Student.name,
+            Student.semester,
+            func.coalesce(Attendance.total_lectures, 0),
+            func.coalesce(Attendance.attended_lectures, 0),
+            db.cast(func.coalesce(Attendance.attendance_percentage, 0), db.Numeric(5, 2)),
+            db.cast(func.coalesce(Student.cached_avg_marks, 0), db.Numeric(5, 2)),
+            func.coalesce(latest_remark, 'N/A')
+        ).outerjoin(Attendance, Attendance.student_id == Student.id).order_by(Student.roll_no)
+        
+        # Write data one keyset-paginated batch at a time
+        last_roll_no = None
+        while True:
+            query = base_query
+            if last_roll_no is not None:
+                query = query.where(Student.roll_no > last_roll_no)
+            rows = db.session.execute(query.limit(Config.EXPORT_BATCH_SIZE)).all()
+            if not rows:
+                break
+            
+            writer.writerows(rows)
+            yield drain()
+            last_roll_no = rows[-1][0]
     
-    # Create response
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=students_report.csv"
-    output.headers["Content-type"] = "text/csv"
-    
-    return output
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=students_report.csv'}
+    )
@@ -0,0 +1,133 @@
+"""
+AI Request Batcher
+
+Collects individual inference requests and hands them to a batch handler
+in groups, so an LLM backend can answer many prompts with one API call
+instead of one call per request.
+
+Requests are queued on an asyncio event loop running in a background
+thread. The worker waits for a first request, then for at most timeout_ms
+more (or until max_batch requests are queued) and calls the handler once
+for the whole batch. Failed handler calls are retried with exponential
+backoff before the error is passed to every waiting caller.
+
+Usage:
+    batcher = AsyncBatcher(handle_prompts, max_batch=16, timeout_ms=30)
+    result = batcher.submit(payload)               # from sync Flask views
+    result = await batcher.submit_async(payload)   # from coroutines
+"""
+
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, List
+
+
+class AsyncBatcher:
+    """
+    Micro-batching front end for a batch inference handler
+
+    The handler receives a list of payloads and must return a list of
+    results in the same order. It may be a plain function (run in a worker
+    thread) or a coroutine function.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], Any], max_batch: int = 16,
+                 timeout_ms: int = 30, retries: int = 3, backoff_ms: int = 100):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000
+        self.retries = retries
+        self.backoff = backoff_ms / 1000
+        self._loop = None
+        self._queue = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, payload: Any, timeout: float = None) -> Any:
+        """
+        Queue a request and block until its batch has been answered
+
+        Args:
+            payload: Single request for the handler
+            timeout: Seconds to wait for the result (None waits forever)
+
+        Returns:
+            The handler's result for this payload
+        """
+        future = asyncio.run_coroutine_threadsafe(self._enqueue(payload), self._ensure_started())
+        return future.result(timeout)
+
+    async def submit_async(self, payload: Any) -> Any:
+        """Queue a request from a coroutine and await its result"""
+        future = asyncio.run_coroutine_threadsafe(self._enqueue(payload), self._ensure_started())
+        return await asyncio.wrap_future(future)
+
+    def _ensure_started(self):
+        """Start the background event loop on first use"""
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._queue = asyncio.Queue()
+                    loop.create_task(self._worker())
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name='ai-batcher', daemon=True).start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    async def _enqueue(self, payload):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _worker(self):
+        """Collect up to max_batch requests per timeout window and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.timeout
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Don't hold up the next batch while this one is in flight
+            loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        """Run one handler call and hand each caller its own result"""
+        payloads = [payload for payload, _ in batch]
+        try:
+            results = await self._call_with_retries(payloads)
+            if len(results) != len(batch):
+                raise ValueError(f'Batch handler returned {len(results)} results '
+                                 f'for {len(batch)} requests')
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _call_with_retries(self, payloads):
+        for attempt in range(self.retries):
+            try:
+                if inspect.iscoroutinefunction(self.handler):
+                    return await self.handler(payloads)
+                return await asyncio.to_thread(self.handler, payloads)
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
@@ -6,10 +6,19 @@ Currently implements rule-based logic, but designed to be easily replaceable
 with actual LLM integration in the future.
 
 Future Enhancement: Replace rule-based methods with OpenAI/Anthropic API calls
+(batch them through app.services.ai_batcher.AsyncBatcher so concurrent
+requests share one API call)
 """
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 from app.config import Config
 
+# Any Unicode letter (word character that is not a digit or underscore)
+_ALPHA_RE = re.compile(r'[^\W\d_]')
+
 class AIEngine:
     """
     AI-powered analytics and recommendation engine
@@ -19,6 +28,7 @@ class AIEngine:
     """
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def generate_performance_remark(marks: float) -> str:
         """
         Generate performance remark based on marks
@@ -40,7 +50,8 @@ class AIEngine:
             return "Needs Improvement"
     
     @staticmethod
-    def generate_attendance_warning(attendance_percentage: float) -> dict:
+    @lru_cache(maxsize=1024)
+    def generate_attendance_warning(attendance_percentage: float) -> Mapping:
         """
         Generate attendance warning and suggestions
         
@@ -48,26 +59,28 @@ class AIEngine:
             attendance_percentage: Current attendance percentage
             
         Returns:
-            dict: Warning information with message and severity
+            Mapping: Read-only warning information with message and severity
+            (results are cached and shared between callers)
             
         Future: Replace with LLM analysis for personalized suggestions
         """
         if attendance_percentage < Config.ATTENDANCE_WARNING_THRESHOLD:
             shortage = Config.ATTENDANCE_WARNING_THRESHOLD - attendance_percentage
-            return {
+            return MappingProxyType({
                 'has_warning': True,
                 'severity': 'high' if shortage > 10 else 'medium',
                 'message': f'⚠ Attendance Shortage: {attendance_percentage:.2f}%',
                 'suggestion': AIEngine._get_attendance_suggestion(shortage)
-            }
-        return {
+            })
+        return MappingProxyType({
             'has_warning': False,
             'severity': 'none',
             'message': 'Attendance is satisfactory',
             'suggestion': 'Keep up the good work!'
-        }
+        })
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _get_attendance_suggestion(shortage: float) -> str:
         """
         Generate attendance improvement suggestion
@@ -82,7 +95,8 @@ class AIEngine:
             return "Minor shortage. A few more attended lectures will help."
     
     @staticmethod
-    def validate_student_data(roll_no: str, name: str, semester: int) -> dict:
+    @lru_cache(maxsize=1024)
+    def validate_student_data(roll_no: str, name: str, semester: int) -> Mapping:
         """
         AI-assisted validation of student data
         
@@ -92,7 +106,8 @@ class AIEngine:
             semester: Student semester
             
         Returns:
-            dict: Validation results with suggestions
+            Mapping: Read-only validation results with suggestions
+            (results are cached and shared between callers)
             
         Future: Use LLM to detect format issues, suggest corrections
         """
@@ -110,18 +125,18 @@ class AIEngine:
             errors.append("Name is required")
         elif len(name.strip()) < 3:
             suggestions.append("Name seems very short. Please verify.")
-        elif not any(char.isalpha() for char in name):
+        elif not _ALPHA_RE.search(name):
             errors.append("Name must contain alphabetic characters")
         
         # Semester validation
         if semester < 1 or semester > 8:
             errors.append("Semester must be between 1 and 8")
         
-        return {
+        return MappingProxyType({
             'is_valid': len(errors) == 0,
-            'errors': errors,
-            'suggestions': suggestions
-        }
+            'errors': tuple(errors),
+            'suggestions': tuple(suggestions)
+        })
     
     @staticmethod
     def calculate_required_attendance(current_total: int, current_attended: int, 
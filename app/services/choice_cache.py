@@ -0,0 +1,66 @@
+"""
+Student Choices Cache
+
+Caches the (id, label) pairs used to populate the student SelectField on
+the attendance and performance forms, so rendering those forms does not
+re-read the whole students table on every request.
+
+The cache is keyed on a cheap signature of the students table
+(latest updated_at and row count) and is also dropped whenever a Student
+is inserted, updated or deleted through the ORM in this process.
+"""
+
+import threading
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Student
+
+_lock = threading.Lock()
+_cache = (None, None)  # (signature, choices)
+
+
+def get_student_choices():
+    """
+    Get SelectField choices for all students ordered by roll number
+
+    Returns:
+        list: (student_id, "ROLL - Name") tuples
+    """
+    global _cache
+
+    signature = tuple(db.session.query(
+        func.max(Student.updated_at),
+        func.count(Student.id)
+    ).one())
+
+    with _lock:
+        cached_signature, choices = _cache
+        if choices is not None and cached_signature == signature:
+            return choices
+
+    rows = Student.query.with_entities(
+        Student.id, Student.roll_no, Student.name
+    ).order_by(Student.roll_no).all()
+    choices = [(r.id, f'{r.roll_no} - {r.name}') for r in rows]
+
+    with _lock:
+        _cache = (signature, choices)
+
+    return choices
+
+
+def invalidate_student_choices():
+    """Drop the cached student choices"""
+    global _cache
+    with _lock:
+        _cache = (None, None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_on_student_change(session, flush_context):
+    """Invalidate the cache when a flush touches any Student row"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Student):
+            invalidate_student_choices()
+            return
@@ -0,0 +1,88 @@
+"""
+Dashboard Statistics Service
+
+Computes the dashboard counters and keeps them in the application cache
+for a short TTL. A committed change to students, attendance or performance
+drops the cached value in the cache this process uses.
+
+With Redis (REDIS_URL set) that cache is shared, so every worker sees the
+invalidation and the TTL only bounds staleness from writers outside this
+application. Without it the cache is per-process SimpleCache: other
+gunicorn workers keep serving their own copy for up to
+DASHBOARD_CACHE_TIMEOUT seconds after a write, so multi-worker
+deployments should configure Redis.
+"""
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app import db, cache
+from app.config import Config
+from app.models import Student, Attendance, Performance
+
+_WATCHED_MODELS = (Student, Attendance, Performance)
+
+
+@cache.memoize(timeout=Config.DASHBOARD_CACHE_TIMEOUT)
+def get_dashboard_stats():
+    """
+    Get the dashboard counters
+
+    Returns:
+        tuple: (total_students, students_with_shortage, students_poor_performance)
+    """
+    total_students = Student.query.count()
+
+    # Students with attendance shortage (range scan on the generated column)
+    students_with_shortage = db.session.query(
+        func.count(func.distinct(Attendance.student_id))
+    ).filter(
+        Attendance.attendance_percentage < Config.ATTENDANCE_WARNING_THRESHOLD
+    ).scalar()
+
+    # Students with poor performance (no marks yet counts as an average of 0)
+    students_poor_performance = Student.query.filter(
+        db.or_(
+            Student.cached_avg_marks.is_(None),
+            Student.cached_avg_marks < Config.PERFORMANCE_AVERAGE_THRESHOLD
+        )
+    ).count()
+
+    return total_students, students_with_shortage, students_poor_performance
+
+
+def invalidate_dashboard_stats():
+    """Drop the cached dashboard counters"""
+    cache.delete_memoized(get_dashboard_stats)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dirty_on_flush(session, flush_context):
+    """Remember that this transaction changed a watched model"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _WATCHED_MODELS):
+            session.info['dashboard_stats_dirty'] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_dirty_on_bulk(orm_execute_state):
+    """Bulk UPDATE/DELETE/INSERT statements bypass the flush"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or
+            orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _WATCHED_MODELS:
+        orm_execute_state.session.info['dashboard_stats_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    # Invalidate only once the change is visible, so a concurrent request
+    # can't re-cache the pre-commit counts
+    if session.info.pop('dashboard_stats_dirty', False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_dirty_on_rollback(session):
+    session.info.pop('dashboard_stats_dirty', None)
@@ -9,10 +9,14 @@ CREATE TABLE IF NOT EXISTS students (
     roll_no VARCHAR(20) UNIQUE NOT NULL,
     name VARCHAR(100) NOT NULL,
     semester INT NOT NULL CHECK (semester BETWEEN 1 AND 8),
+    cached_avg_marks DOUBLE NULL,
+    cached_perf_count INT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_roll_no (roll_no),
-    INDEX idx_name (name)
+    INDEX idx_name (name),
+    INDEX ix_students_cached_avg_marks (cached_avg_marks),
+    FULLTEXT INDEX ft_student_search (name, roll_no)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Attendance Table
@@ -30,7 +34,8 @@ CREATE TABLE IF NOT EXISTS attendance (
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
     CONSTRAINT chk_attendance CHECK (attended_lectures <= total_lectures),
-    INDEX idx_student_id (student_id)
+    INDEX idx_student_id (student_id),
+    INDEX ix_attendance_attendance_percentage (attendance_percentage)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Performance Table
@@ -43,9 +48,14 @@ CREATE TABLE IF NOT EXISTS performance (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
-    INDEX idx_student_id (student_id)
+    INDEX idx_student_id (student_id),
+    INDEX ix_perf_student_subject (student_id, subject_name),
+    INDEX ix_perf_student_created (student_id, created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Existing databases: CREATE TABLE IF NOT EXISTS leaves older tables as they
+-- are, so run `python upgrade_db.py` to add the newer columns and indexes
+
 -- Admin Users Table (Optional)
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -53,7 +63,8 @@ CREATE TABLE IF NOT EXISTS users (
     password_hash VARCHAR(255) NOT NULL,
     is_admin BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    INDEX idx_username (username)
+    INDEX idx_username (username),
+    INDEX ix_user_login_cover (username, password_hash)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Insert default admin user (password: admin123)
@@ -1,16 +1,22 @@
+from sqlalchemy import update
 from werkzeug.security import generate_password_hash
 from app import create_app, db
+from app.config import Config
 from app.models import User
 
 app = create_app()
 
 with app.app_context():
-    admin = User.query.filter_by(username="admin").first()
+    # Single UPDATE; no need to load the User row first
+    result = db.session.execute(
+        update(User)
+        .where(User.username == "admin")
+        .values(password_hash=generate_password_hash("admin123", method=Config.PASSWORD_HASH_METHOD))
+    )
+    db.session.commit()
 
-    if not admin:
+    if result.rowcount == 0:
         print("Admin user not found in DB.")
     else:
-        admin.password_hash = generate_password_hash("admin123", method="scrypt")
-        db.session.commit()
         print("Admin password fixed successfully.")
         print("Login: admin / admin123")
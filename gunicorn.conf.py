@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration
+
+Threaded workers let each process overlap requests that are waiting on
+MySQL; keep DB_POOL_SIZE >= threads so every thread can hold a connection.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = 60
+accesslog = '-'
@@ -7,16 +7,19 @@ from app.models import User, Student, Attendance, Performance
 
 app = create_app()
 
+# Names exposed in `flask shell`; built once at import
+SHELL_CONTEXT = {
+    'db': db,
+    'User': User,
+    'Student': Student,
+    'Attendance': Attendance,
+    'Performance': Performance
+}
+
 @app.shell_context_processor
 def make_shell_context():
     """Make database models available in Flask shell"""
-    return {
-        'db': db,
-        'User': User,
-        'Student': Student,
-        'Attendance': Attendance,
-        'Performance': Performance
-    }
+    return SHELL_CONTEXT
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
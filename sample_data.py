@@ -7,6 +7,7 @@ import sys
 import os
 from faker import Faker
 import random
+from sqlalchemy import insert
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
@@ -31,15 +32,14 @@ def generate_sample_students(num_students=20):
         
         print(f"Generating {num_students} sample students...")
         
+        # Build every row up front, then insert each table with one executemany
+        students = []
+        attendance_by_roll = {}
+        performance_by_roll = {}
+        subjects = ['Mathematics', 'Physics', 'Chemistry']
+        
         for i in range(num_students):
-            # Generate student
             roll_no = f"CS2024{str(i+1).zfill(3)}"
-            name = fake.name()
-            semester = random.randint(1, 8)
-            
-            student = Student(roll_no=roll_no, name=name, semester=semester)
-            db.session.add(student)
-            db.session.flush()
             
             # Generate attendance
             total_lectures = random.randint(30, 60)
@@ -47,18 +47,40 @@ def generate_sample_students(num_students=20):
                 attended = random.randint(int(total_lectures * 0.5), int(total_lectures * 0.7))
             else:
                 attended = random.randint(int(total_lectures * 0.8), total_lectures)
-            
-            attendance = Attendance(student_id=student.id, total_lectures=total_lectures, attended_lectures=attended)
-            db.session.add(attendance)
+            attendance_by_roll[roll_no] = {'total_lectures': total_lectures, 'attended_lectures': attended}
             
             # Generate performance
-            subjects = ['Mathematics', 'Physics', 'Chemistry']
+            performance_by_roll[roll_no] = []
             for subject in random.sample(subjects, random.randint(1, 3)):
-                marks = random.uniform(40, 100)
-                remark = AIEngine.generate_performance_remark(marks)
-                
-                performance = Performance(student_id=student.id, subject_name=subject, marks=round(marks, 2), remark=remark)
-                db.session.add(performance)
+                marks = round(random.uniform(40, 100), 2)
+                performance_by_roll[roll_no].append({
+                    'subject_name': subject,
+                    'marks': marks,
+                    'remark': AIEngine.generate_performance_remark(marks)
+                })
+            
+            # Bulk inserts skip the Performance events, so fill the summary here
+            marks_list = [p['marks'] for p in performance_by_roll[roll_no]]
+            students.append({
+                'roll_no': roll_no,
+                'name': fake.name(),
+                'semester': random.randint(1, 8),
+                'cached_avg_marks': sum(marks_list) / len(marks_list),
+                'cached_perf_count': len(marks_list)
+            })
+        
+        db.session.execute(insert(Student), students)
+        ids = dict(db.session.query(Student.roll_no, Student.id).all())
+        
+        db.session.execute(insert(Attendance), [
+            {'student_id': ids[roll_no], **row}
+            for roll_no, row in attendance_by_roll.items()
+        ])
+        db.session.execute(insert(Performance), [
+            {'student_id': ids[roll_no], **row}
+            for roll_no, rows in performance_by_roll.items()
+            for row in rows
+        ])
         
         db.session.commit()
         
@@ -0,0 +1,74 @@
+"""
+Upgrade an existing database to the current schema
+
+db_setup.sql only creates missing tables, so databases created before the
+cached performance summary and the newer indexes were introduced need this
+script. Each step is skipped when it has already been applied, so it is
+safe to re-run; the cached summary is re-synced from the performance
+table on every run.
+
+Usage:
+    python upgrade_db.py
+"""
+
+from sqlalchemy import inspect, text
+from app import create_app, db
+
+# students columns for the cached performance summary
+SUMMARY_COLUMNS = [
+    ('cached_avg_marks', 'ALTER TABLE students ADD COLUMN cached_avg_marks DOUBLE NULL AFTER semester'),
+    ('cached_perf_count', 'ALTER TABLE students ADD COLUMN cached_perf_count INT NULL DEFAULT 0 AFTER cached_avg_marks'),
+]
+
+# (table, index name, DDL)
+INDEXES = [
+    ('students', 'ix_students_cached_avg_marks',
+     'ALTER TABLE students ADD INDEX ix_students_cached_avg_marks (cached_avg_marks)'),
+    ('students', 'ft_student_search',
+     'ALTER TABLE students ADD FULLTEXT INDEX ft_student_search (name, roll_no)'),
+    ('performance', 'ix_perf_student_subject',
+     'ALTER TABLE performance ADD INDEX ix_perf_student_subject (student_id, subject_name)'),
+    ('performance', 'ix_perf_student_created',
+     'ALTER TABLE performance ADD INDEX ix_perf_student_created (student_id, created_at)'),
+    ('attendance', 'ix_attendance_attendance_percentage',
+     'ALTER TABLE attendance ADD INDEX ix_attendance_attendance_percentage (attendance_percentage)'),
+    ('users', 'ix_user_login_cover',
+     'ALTER TABLE users ADD INDEX ix_user_login_cover (username, password_hash)'),
+]
+
+# updated_at is pinned so the backfill doesn't look like student edits
+BACKFILL_SUMMARY = '''
+    UPDATE students SET
+        cached_avg_marks = (SELECT AVG(p.marks) FROM performance p WHERE p.student_id = students.id),
+        cached_perf_count = (SELECT COUNT(*) FROM performance p WHERE p.student_id = students.id),
+        updated_at = updated_at
+'''
+
+app = create_app()
+
+with app.app_context():
+    inspector = inspect(db.engine)
+
+    with db.engine.begin() as conn:
+        student_columns = {c['name'] for c in inspector.get_columns('students')}
+        for column, ddl in SUMMARY_COLUMNS:
+            if column in student_columns:
+                print(f"students.{column} already present")
+            else:
+                conn.execute(text(ddl))
+                print(f"Added students.{column}")
+
+        existing_indexes = {}
+        for table, name, ddl in INDEXES:
+            if table not in existing_indexes:
+                existing_indexes[table] = {ix['name'] for ix in inspector.get_indexes(table)}
+            if name in existing_indexes[table]:
+                print(f"{table}.{name} already present")
+            else:
+                conn.execute(text(ddl))
+                print(f"Added index {table}.{name}")
+
+        result = conn.execute(text(BACKFILL_SUMMARY))
+        print(f"Re-synced cached performance summary for {result.rowcount} student(s)")
+
+    print("Database upgrade complete.")
@@ -0,0 +1,10 @@
+"""
+Production WSGI entry point
+
+Run with gunicorn (settings in gunicorn.conf.py):
+    gunicorn wsgi:application
+"""
+
+from app import create_app
+
+application = create_app()